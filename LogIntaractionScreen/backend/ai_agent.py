@@ -3,6 +3,9 @@
 # This file encapsulates the state machine and LLM calls, keeping the API logic clean.
 #
 import os
+import re
+import time
+import groq
 from groq import Groq
 from langchain_groq import ChatGroq
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder, SystemMessagePromptTemplate, HumanMessagePromptTemplate
@@ -11,8 +14,9 @@ from langchain_core.output_parsers import JsonOutputParser
 from langgraph.graph import StateGraph, END
 from typing import List, Optional, Dict, Any, TypedDict, Annotated
 from models import InteractionBase
-from datetime import date
+from datetime import date, timedelta
 from langchain_core.tools import tool
+from resilience import DeadlineExceeded, remaining_time
 # MODIFIED: Import all necessary DB functions
 from db import find_interactions_by_criteria, update_interaction_in_db, get_interaction_by_hcp_and_date
 
@@ -23,9 +27,53 @@ os.environ["GROQ_API_KEY"] = GROQ_API_KEY
 if not GROQ_API_KEY or GROQ_API_KEY == "YOUR_GROQ_KEY":
     raise ValueError("GROQ_API_KEY is not set. Please update the code.")
 
-# Initialize the Groq language models
-gemma_model = ChatGroq(temperature=0, model="gemma2-9b-it")
-llama_model = ChatGroq(temperature=0, model="llama3-70b-8192")
+# Initialize the Groq language models.
+# The client's own retries are disabled: its backoff (and any server Retry-After) is not
+# aware of the request deadline, so invoke_llm retries instead while time remains.
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BASE_DELAY = 0.5
+LLM_RETRY_MAX_DELAY = 8.0
+gemma_model = ChatGroq(temperature=0, model="gemma2-9b-it", max_retries=0)
+llama_model = ChatGroq(temperature=0, model="llama3-70b-8192", max_retries=0)
+
+# Transient errors worth retrying if the deadline allows.
+LLM_RETRYABLE_ERRORS = (groq.APIConnectionError, groq.RateLimitError, groq.InternalServerError)
+# Errors meaning the model is slow or unavailable (as opposed to a bad answer).
+# These are never swallowed; the API layer uses them to trip the circuit breaker.
+LLM_UNAVAILABLE_ERRORS = (DeadlineExceeded,) + LLM_RETRYABLE_ERRORS
+
+def with_deadline(model, deadline: Optional[float]):
+    """
+    Binds a per-call timeout so a single model call finishes before the request
+    deadline. Returns the model unchanged when there is no deadline.
+    """
+    remaining = remaining_time(deadline)
+    if remaining is None:
+        return model
+    return model.bind(timeout=remaining)
+
+def invoke_llm(prompt, model, inputs: Dict[str, Any], deadline: Optional[float], parser=None):
+    """
+    Runs `prompt | model (| parser)`, retrying transient Groq errors with exponential
+    backoff. Each attempt is bounded by the time left, and no retry is started whose
+    backoff would run past the deadline.
+    """
+    attempt = 0
+    while True:
+        chain = prompt | with_deadline(model, deadline)
+        if parser is not None:
+            chain = chain | parser
+        try:
+            return chain.invoke(inputs)
+        except LLM_RETRYABLE_ERRORS:
+            attempt += 1
+            if attempt > LLM_MAX_RETRIES:
+                raise
+            delay = min(LLM_RETRY_BASE_DELAY * 2 ** (attempt - 1), LLM_RETRY_MAX_DELAY)
+            remaining = remaining_time(deadline)
+            if remaining is not None and remaining <= delay:
+                raise
+            time.sleep(delay)
 
 # --- Define the Tools ---
 @tool
@@ -119,6 +167,7 @@ class AgentState(TypedDict):
     """The state of the conversation graph."""
     messages: Annotated[List[BaseMessage], lambda a, b: a + b]
     interaction_id: Optional[int] # ID for context
+    deadline: Optional[float] # Request deadline (time.monotonic()) for LLM timeouts
     parsed_data: Optional[Dict]
     fetched_data: Optional[Dict]
     tool_output: Optional[str]
@@ -142,8 +191,7 @@ def call_agent_with_tools(state: AgentState):
         ("system", system_prompt),
         MessagesPlaceholder(variable_name="messages")
     ])
-    chain = prompt_template | agent_with_tools
-    response = chain.invoke({"messages": messages})
+    response = invoke_llm(prompt_template, agent_with_tools, {"messages": messages}, state.get('deadline'))
     return {"messages": [response]}
 
 def call_tool(state: AgentState):
@@ -184,8 +232,7 @@ def call_llm(state: AgentState):
         ("system", "You are a friendly and helpful AI assistant for logging interactions. Respond conversationally and ask clarifying questions to gather details."),
         MessagesPlaceholder(variable_name="messages")
     ])
-    chain = prompt_template | gemma_model
-    response = chain.invoke({"messages": messages})
+    response = invoke_llm(prompt_template, gemma_model, {"messages": messages}, state.get('deadline'))
     return {"messages": [response]}
 
 def extract_data(state: AgentState):
@@ -206,12 +253,13 @@ def extract_data(state: AgentState):
         ],
         partial_variables={"format_instructions": parser.get_format_instructions(), "current_date": date.today().isoformat()}
     )
-    extraction_chain = extraction_prompt | llama_model | parser
     try:
-        parsed_data = extraction_chain.invoke({"messages": str(messages)})
+        parsed_data = invoke_llm(extraction_prompt, llama_model, {"messages": str(messages)}, state.get('deadline'), parser)
         if parsed_data and isinstance(parsed_data, dict) and parsed_data.get('hcpName'):
             return {"parsed_data": parsed_data}
         return {"parsed_data": None}
+    except LLM_UNAVAILABLE_ERRORS:
+        raise
     except Exception as e:
         print(f"Extraction failed: {e}")
         return {"parsed_data": None}
@@ -224,7 +272,7 @@ def extract_data(state: AgentState):
 # --- Standalone Function for Form Population ---
 
 # NEW: This function is dedicated to parsing a single prompt into form data.
-def extract_for_form(text_input: str):
+def extract_for_form(text_input: str, deadline: Optional[float] = None):
     """
     Parses a single block of unstructured text to extract all possible fields for an interaction.
     """
@@ -258,15 +306,66 @@ def extract_for_form(text_input: str):
     )
     
     # Use the more powerful model for this complex extraction task
-    extraction_chain = extraction_prompt | llama_model | parser
-    
     try:
-        parsed_data = extraction_chain.invoke({"text_input": text_input})
+        parsed_data = invoke_llm(extraction_prompt, llama_model, {"text_input": text_input}, deadline, parser)
         return parsed_data
+    except LLM_UNAVAILABLE_ERRORS:
+        raise
     except Exception as e:
         print(f"Extraction for form failed: {e}")
         return None
 
+# --- Rule-Based Fallback (Degraded Mode) ---
+
+HCP_NAME_PATTERN = re.compile(r"\b(Dr\.?\s+[A-Z][\w'-]+(?:\s+[A-Z][\w'-]+)?)")
+ISO_DATE_PATTERN = re.compile(r"\b(\d{4}-\d{2}-\d{2})\b")
+INTERACTION_TYPE_KEYWORDS = {
+    "Call": ("call", "phone"),
+    "Email": ("email", "e-mail"),
+    "Conference": ("conference", "congress", "symposium"),
+    "Meeting": ("meeting", "met", "visit", "lunch"),
+}
+SENTIMENT_KEYWORDS = {
+    "Positive": ("positive", "interested", "happy", "keen", "agreed", "great", "good"),
+    "Negative": ("negative", "unhappy", "concerned", "refused", "declined", "skeptical", "bad"),
+}
+
+# NEW: Used in place of the LLM when it is unavailable, so the form still gets pre-filled.
+def extract_with_rules(text_input: str) -> Optional[Dict[str, Any]]:
+    """
+    Extracts interaction fields from text with simple patterns, without calling the LLM.
+    Returns None if no HCP name can be found.
+    """
+    name_match = HCP_NAME_PATTERN.search(text_input)
+    if not name_match:
+        return None
+
+    lowered = text_input.lower()
+    date_match = ISO_DATE_PATTERN.search(text_input)
+    if date_match:
+        interaction_date = date_match.group(1)
+    elif "yesterday" in lowered:
+        interaction_date = (date.today() - timedelta(days=1)).isoformat()
+    else:
+        interaction_date = date.today().isoformat()
+
+    def first_keyword_match(options: Dict[str, tuple], default: Optional[str]) -> Optional[str]:
+        for label, keywords in options.items():
+            if any(re.search(rf"\b{re.escape(word)}\b", lowered) for word in keywords):
+                return label
+        return default
+
+    return {
+        "hcpName": name_match.group(1),
+        "interactionType": first_keyword_match(INTERACTION_TYPE_KEYWORDS, None),
+        "interactionDate": interaction_date,
+        "summary": text_input.strip(),
+        "discussionTopics": None,
+        "sentiment": first_keyword_match(SENTIMENT_KEYWORDS, "Neutral"),
+        "outcomes": None,
+        "followUp": None,
+    }
+
 log_workflow = StateGraph(AgentState)
 log_workflow.add_node("llm", call_llm)
 log_workflow.add_node("extract", extract_data)
@@ -0,0 +1,119 @@
+#
+# Cold storage for archived hcp_interactions partitions.
+# Each calendar month of interactions is kept as one zstd-compressed, column-oriented
+# file on local disk (one array per column), so old history no longer has to live in
+# the hot MySQL table but can still be read back by the functions in db.py.
+#
+import os
+import orjson
+import zstandard
+from datetime import date, datetime
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
+
+# --- Archive Configuration ---
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "archive"))
+COMPRESSION_LEVEL = int(os.getenv("ARCHIVE_COMPRESSION_LEVEL", "10"))
+ARCHIVE_FORMAT = "hcp-columnar-v1"
+FILE_PREFIX = "hcp_interactions_"
+FILE_SUFFIX = ".json.zst"
+
+# Columns that must be restored to the types mysql.connector returns.
+DATE_COLUMNS = {"interaction_date"}
+DATETIME_COLUMNS = {"created_at", "updated_at"}
+
+def _month_start(value: date) -> date:
+    return value.replace(day=1)
+
+def _month_path(month: date) -> str:
+    return os.path.join(ARCHIVE_DIR, f"{FILE_PREFIX}{month:%Y-%m}{FILE_SUFFIX}")
+
+def archived_months() -> List[date]:
+    """Lists the months that have an archive file, oldest first."""
+    if not os.path.isdir(ARCHIVE_DIR):
+        return []
+    months = []
+    for name in os.listdir(ARCHIVE_DIR):
+        if name.startswith(FILE_PREFIX) and name.endswith(FILE_SUFFIX):
+            stamp = name[len(FILE_PREFIX):-len(FILE_SUFFIX)]
+            try:
+                months.append(datetime.strptime(stamp, "%Y-%m").date())
+            except ValueError:
+                continue
+    return sorted(months)
+
+def _to_columns(rows: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    columns: Dict[str, List[Any]] = {}
+    for name in rows[0].keys():
+        columns[name] = [row.get(name) for row in rows]
+    return columns
+
+def _from_columns(columns: Dict[str, List[Any]]) -> Tuple[Dict[str, Any], ...]:
+    for name, values in columns.items():
+        if name in DATE_COLUMNS:
+            columns[name] = [date.fromisoformat(v) if v else None for v in values]
+        elif name in DATETIME_COLUMNS:
+            columns[name] = [datetime.fromisoformat(v) if v else None for v in values]
+    names = list(columns.keys())
+    return tuple(dict(zip(names, values)) for values in zip(*columns.values()))
+
+@lru_cache(maxsize=32)
+def _load_month_file(path: str, mtime: float) -> Tuple[Dict[str, Any], ...]:
+    # Keyed on mtime so a rewritten month file is never served stale from the cache.
+    with open(path, "rb") as f:
+        payload = orjson.loads(zstandard.ZstdDecompressor().decompress(f.read()))
+    if payload.get("format") != ARCHIVE_FORMAT:
+        raise ValueError(f"Unsupported archive format in {path}: {payload.get('format')}")
+    return _from_columns(payload["columns"])
+
+def _read_month(month: date) -> List[Dict[str, Any]]:
+    path = _month_path(month)
+    if not os.path.exists(path):
+        return []
+    # Copy the cached rows so callers can modify them freely.
+    return [dict(row) for row in _load_month_file(path, os.path.getmtime(path))]
+
+def _write_month(month: date, rows: List[Dict[str, Any]]):
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    path = _month_path(month)
+    payload = orjson.dumps({"format": ARCHIVE_FORMAT, "row_count": len(rows), "columns": _to_columns(rows)})
+    data = zstandard.ZstdCompressor(level=COMPRESSION_LEVEL).compress(payload)
+    # Write to a temporary file and rename, so a crash never leaves a truncated archive.
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def write_archived_rows(rows: List[Dict[str, Any]]) -> int:
+    """
+    Adds interaction rows to the archive, merging them into the file for the month of
+    each row's `interaction_date`. Rows already archived under the same ID are replaced.
+    Returns the number of rows written.
+    """
+    by_month: Dict[date, List[Dict[str, Any]]] = {}
+    for row in rows:
+        by_month.setdefault(_month_start(row["interaction_date"]), []).append(row)
+    for month, month_rows in by_month.items():
+        merged = {row["id"]: row for row in _read_month(month)}
+        merged.update({row["id"]: row for row in month_rows})
+        _write_month(month, sorted(merged.values(), key=lambda row: row["id"]))
+    return len(rows)
+
+def read_archived_rows(start_date: Optional[date] = None, end_date: Optional[date] = None) -> List[Dict[str, Any]]:
+    """Reads archived interaction rows whose `interaction_date` falls within the (inclusive) range."""
+    rows = []
+    for month in archived_months():
+        if start_date and month < _month_start(start_date):
+            continue
+        if end_date and month > end_date:
+            continue
+        for row in _read_month(month):
+            row_date = row["interaction_date"]
+            if start_date and row_date < start_date:
+                continue
+            if end_date and row_date > end_date:
+                continue
+            rows.append(row)
+    return rows
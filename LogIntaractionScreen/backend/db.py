@@ -2,10 +2,14 @@
 # Database handler for the HCP Interaction Logger.
 #
 import os
+import math
 import mysql.connector
+from mysql.connector import errorcode
 import json
-from datetime import date
-from typing import List, Dict, Any, Optional
+from datetime import date, datetime
+from typing import List, Dict, Any, Optional, Tuple
+from resilience import remaining_time
+from archive import read_archived_rows, write_archived_rows
 
 # --- Database Configuration ---
 DB_HOST = os.getenv("DB_HOST", "localhost")
@@ -13,20 +17,62 @@ DB_USER = os.getenv("DB_USER", "root")
 DB_PASSWORD = os.getenv("DB_PASSWORD", "Abhishek@1259")
 DB_NAME = os.getenv("DB_NAME", "hcpinteractio")
 
+# --- Partitioning Configuration ---
+# hcp_interactions is RANGE-partitioned by month of interaction_date. Partitions are
+# kept this many months ahead of today, and months older than the hot retention
+# window are moved to the on-disk archive (see archive.py).
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+HOT_RETENTION_MONTHS = int(os.getenv("HOT_RETENTION_MONTHS", "12"))
+ARCHIVE_STAGING_TABLE = "hcp_interactions_archive_staging"
+
 def get_db_connection():
-    """Establishes and returns a database connection."""
+    """
+    Establishes and returns a database connection.
+    Inside a request with a deadline, the connect, socket and statement timeouts are
+    capped at the time remaining so a slow database cannot outlive the request.
+    """
+    remaining = remaining_time()
+    connect_args = {}
+    if remaining is not None:
+        seconds = max(1, math.ceil(remaining))
+        connect_args = {"connection_timeout": seconds, "read_timeout": seconds, "write_timeout": seconds}
     try:
         conn = mysql.connector.connect(
             host=DB_HOST,
             user=DB_USER,
             password=DB_PASSWORD,
-            database=DB_NAME
+            database=DB_NAME,
+            **connect_args
         )
+        if remaining is not None:
+            cursor = conn.cursor()
+            cursor.execute("SET SESSION MAX_EXECUTION_TIME = %s", (max(1, int(remaining * 1000)),))
+            cursor.close()
         return conn
     except mysql.connector.Error as err:
         print(f"Database connection error: {err}")
         raise
 
+def _json_default(value: Any) -> Any:
+    """Serializes the date/datetime values returned by mysql.connector."""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+def _record_interaction_event(cursor, interaction_id: int, event_type: str, payload: Dict[str, Any]):
+    """
+    Appends a change event for the live feed. Must be called with the cursor of the
+    transaction that wrote the change, so the event commits (or rolls back) with it.
+    """
+    # Event IDs come from a single locked sequence row rather than AUTO_INCREMENT, so
+    # they become visible in commit order and a resume cursor can never skip an event.
+    cursor.execute("UPDATE hcp_interaction_event_seq SET last_id = LAST_INSERT_ID(last_id + 1)")
+    query = """
+        INSERT INTO hcp_interaction_events (id, interaction_id, event_type, payload)
+        VALUES (LAST_INSERT_ID(), %s, %s, %s)
+    """
+    cursor.execute(query, (interaction_id, event_type, json.dumps(payload, default=_json_default)))
+
 # NEW: Add this function to fetch a record by its primary key.
 def get_interaction_by_id(interaction_id: int) -> Optional[Dict[str, Any]]:
     """Fetches a single interaction record by its unique ID."""
@@ -45,6 +91,70 @@ def get_interaction_by_id(interaction_id: int) -> Optional[Dict[str, Any]]:
             cursor.close()
             conn.close()
 
+def _add_months(month: date, count: int) -> date:
+    """Returns the first day of the month `count` months after `month`."""
+    years, month_index = divmod(month.month - 1 + count, 12)
+    return date(month.year + years, month_index + 1, 1)
+
+def _partition_name(month: date) -> str:
+    return f"p{month:%Y%m}"
+
+def _partition_month(name: str) -> date:
+    return datetime.strptime(name[1:], "%Y%m").date()
+
+def _partition_definitions(first_month: date, last_month: date) -> List[str]:
+    """Builds monthly partition clauses from `first_month` through `last_month`, inclusive."""
+    definitions = []
+    month = first_month
+    while month <= last_month:
+        definitions.append(
+            f"PARTITION {_partition_name(month)} VALUES LESS THAN ('{_add_months(month, 1).isoformat()}')"
+        )
+        month = _add_months(month, 1)
+    return definitions
+
+def _get_partition_names(conn) -> List[str]:
+    """Returns the monthly partitions of hcp_interactions (excluding pmax), oldest first."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT PARTITION_NAME FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'hcp_interactions'
+        AND PARTITION_NAME IS NOT NULL AND PARTITION_NAME <> 'pmax'
+        ORDER BY PARTITION_ORDINAL_POSITION
+    """, (DB_NAME,))
+    names = [row[0] for row in cursor.fetchall()]
+    cursor.close()
+    return names
+
+def _ensure_partitioning(cursor):
+    """
+    Converts hcp_interactions to monthly RANGE partitioning on interaction_date if it is
+    not partitioned yet. MySQL requires the partition column in the primary key, so the
+    key becomes (id, interaction_date) and interaction_date becomes NOT NULL.
+    """
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'hcp_interactions' AND PARTITION_NAME IS NOT NULL
+    """, (DB_NAME,))
+    if cursor.fetchone()[0]:
+        return
+
+    cursor.execute("UPDATE hcp_interactions SET interaction_date = DATE(created_at) WHERE interaction_date IS NULL")
+    cursor.execute("""
+        ALTER TABLE hcp_interactions
+        MODIFY interaction_date DATE NOT NULL,
+        DROP PRIMARY KEY,
+        ADD PRIMARY KEY (id, interaction_date)
+    """)
+    cursor.execute("SELECT MIN(interaction_date) FROM hcp_interactions")
+    oldest = cursor.fetchone()[0] or date.today()
+    definitions = _partition_definitions(
+        oldest.replace(day=1), _add_months(date.today().replace(day=1), PARTITION_MONTHS_AHEAD)
+    )
+    # pmax catches dates beyond the newest month until rotation splits it.
+    definitions.append("PARTITION pmax VALUES LESS THAN (MAXVALUE)")
+    cursor.execute(f"ALTER TABLE hcp_interactions PARTITION BY RANGE COLUMNS(interaction_date) ({', '.join(definitions)})")
+
 def create_tables():
     """Creates the necessary tables if they do not exist."""
     conn = None
@@ -54,17 +164,63 @@ def create_tables():
         
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS hcp_interactions (
-                id INT AUTO_INCREMENT PRIMARY KEY,
+                id INT AUTO_INCREMENT,
                 hcp_name VARCHAR(255),
                 interaction_type VARCHAR(50),
-                interaction_date DATE,
+                interaction_date DATE NOT NULL,
                 summary TEXT,
                 discussion_topics JSON,
                 sentiment VARCHAR(20),
                 outcomes TEXT,
                 follow_up TEXT,
                 logging_method VARCHAR(10) NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                row_version INT NOT NULL DEFAULT 1,
+                PRIMARY KEY (id, interaction_date)
+            );
+        """)
+
+        # Bring tables created before row versioning up to date.
+        cursor.execute("""
+            SELECT COLUMN_NAME FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'hcp_interactions'
+        """, (DB_NAME,))
+        existing_columns = {row[0] for row in cursor.fetchall()}
+        if 'updated_at' not in existing_columns:
+            cursor.execute("ALTER TABLE hcp_interactions ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP")
+        if 'row_version' not in existing_columns:
+            cursor.execute("ALTER TABLE hcp_interactions ADD COLUMN row_version INT NOT NULL DEFAULT 1")
+
+        _ensure_partitioning(cursor)
+
+        # Append-only change log backing the live feed. The event id is the cursor
+        # clients resume from, and every worker tails this table for fan-out.
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS hcp_interaction_event_seq (
+                id TINYINT PRIMARY KEY,
+                last_id BIGINT NOT NULL
+            );
+        """)
+        cursor.execute("INSERT IGNORE INTO hcp_interaction_event_seq (id, last_id) VALUES (1, 0)")
+
+        # Bumped whenever archiving moves rows out of hcp_interactions, which (unlike
+        # inserts and updates) does not advance the event sequence.
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS hcp_interactions_archive_state (
+                id TINYINT PRIMARY KEY,
+                generation BIGINT NOT NULL
+            );
+        """)
+        cursor.execute("INSERT IGNORE INTO hcp_interactions_archive_state (id, generation) VALUES (1, 0)")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS hcp_interaction_events (
+                id BIGINT PRIMARY KEY,
+                interaction_id INT NOT NULL,
+                event_type VARCHAR(10) NOT NULL,
+                payload JSON NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                INDEX idx_events_created_at (created_at)
             );
         """)
         
@@ -86,7 +242,8 @@ def insert_interaction_to_db(data: Dict[str, Any], logging_method: str) -> Optio
         
         hcp_name = data.get('hcpName')
         interaction_type = data.get('interactionType')
-        interaction_date = data.get('interactionDate')
+        # interaction_date is the partition key, so it cannot be left empty.
+        interaction_date = data.get('interactionDate') or date.today().isoformat()
         summary = data.get('summary')
         discussion_topics = data.get('discussionTopics')
         if discussion_topics is not None:
@@ -104,11 +261,19 @@ def insert_interaction_to_db(data: Dict[str, Any], logging_method: str) -> Optio
         values = (hcp_name, interaction_type, interaction_date, summary, discussion_topics, sentiment, outcomes, follow_up, logging_method)
         cursor.execute(query, values)
         new_id = cursor.lastrowid # Get the ID of the new row
-        conn.commit()
+        if not new_id:
+            conn.commit()
+            return None
 
-        if new_id:
-            return get_interaction_by_id(new_id) # Return the full new record
-        return None
+        # Read the new record back inside the same transaction so the feed event
+        # carries exactly what was written.
+        cursor.close()
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("SELECT * FROM hcp_interactions WHERE id = %s", (new_id,))
+        new_interaction = cursor.fetchone()
+        _record_interaction_event(cursor, new_id, "insert", new_interaction)
+        conn.commit()
+        return new_interaction # Return the full new record
         
     except mysql.connector.Error as err:
         print(f"Error inserting data into DB: {err}")
@@ -126,6 +291,7 @@ def update_interaction_in_db(interaction_id: int, data: Dict[str, Any]) -> bool:
         cursor = conn.cursor()
         updates = []
         values = []
+        delta = {}
         db_field_map = {
             'hcpName': 'hcp_name', 'interactionType': 'interaction_type', 'interactionDate': 'interaction_date',
             'summary': 'summary', 'discussionTopics': 'discussion_topics', 'sentiment': 'sentiment',
@@ -139,14 +305,22 @@ def update_interaction_in_db(interaction_id: int, data: Dict[str, Any]) -> bool:
                 if value is not None:
                     updates.append(f"{db_key} = %s")
                     values.append(value)
+                    delta[db_key] = value
         if not updates:
             return False
+        # Every successful update bumps the row version, which feeds the list ETag.
+        updates.append("row_version = row_version + 1")
+        updates.append("updated_at = CURRENT_TIMESTAMP")
         query = f"UPDATE hcp_interactions SET {', '.join(updates)} WHERE id = %s"
         values.append(interaction_id)
         cursor.execute(query, tuple(values))
-        conn.commit()
         if cursor.rowcount == 0:
+            conn.commit()
             return False
+        cursor.execute("SELECT row_version, updated_at FROM hcp_interactions WHERE id = %s", (interaction_id,))
+        delta['row_version'], delta['updated_at'] = cursor.fetchone()
+        _record_interaction_event(cursor, interaction_id, "update", {"id": interaction_id, **delta})
+        conn.commit()
         return True
     except mysql.connector.Error as err:
         print(f"Error updating data in DB: {err}")
@@ -156,15 +330,81 @@ def update_interaction_in_db(interaction_id: int, data: Dict[str, Any]) -> bool:
             cursor.close()
             conn.close()
 
-def get_all_interactions() -> List[Dict[str, Any]]:
-    """Fetches all interaction records from the database."""
+def _parse_date(value: Any) -> Optional[date]:
+    """Parses a YYYY-MM-DD string (or passes a date through); returns None if it is not a valid date."""
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+def _read_archive_staging(start_date: Optional[date], end_date: Optional[date]) -> List[Dict[str, Any]]:
+    """
+    Reads rows from the archive staging table, which holds a partition between its
+    removal from hcp_interactions and the end of its export (or after a failed export).
+    Returns an empty list when no export is in progress.
+    """
+    conn = None
+    rows = []
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        conditions = []
+        params = []
+        if start_date:
+            conditions.append("interaction_date >= %s")
+            params.append(start_date)
+        if end_date:
+            conditions.append("interaction_date <= %s")
+            params.append(end_date)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        cursor.execute(f"SELECT * FROM {ARCHIVE_STAGING_TABLE} {where}", tuple(params))
+        rows = cursor.fetchall()
+    except mysql.connector.Error as err:
+        if err.errno != errorcode.ER_NO_SUCH_TABLE:
+            print(f"Error fetching archive staging rows from DB: {err}")
+            raise
+    finally:
+        if conn and conn.is_connected():
+            cursor.close()
+            conn.close()
+    return rows
+
+def _read_cold_rows(start_date: Optional[date], end_date: Optional[date]) -> List[Dict[str, Any]]:
+    """Reads rows no longer in hcp_interactions: the on-disk archive plus any unfinished export."""
+    rows = {row['id']: row for row in read_archived_rows(start_date, end_date)}
+    rows.update({row['id']: row for row in _read_archive_staging(start_date, end_date)})
+    return list(rows.values())
+
+def _merge_with_archive(hot_rows: List[Dict[str, Any]], archived_rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Combines hot and archived rows, newest first. The hot copy wins if a row is in both."""
+    hot_ids = {row['id'] for row in hot_rows}
+    merged = hot_rows + [row for row in archived_rows if row['id'] not in hot_ids]
+    merged.sort(key=lambda row: row['created_at'], reverse=True)
+    return merged
+
+def get_all_interactions(start_date: Optional[date] = None, end_date: Optional[date] = None) -> List[Dict[str, Any]]:
+    """
+    Fetches interaction records from the database, optionally limited to an (inclusive)
+    interaction_date range. When a range is given, archived months are included too.
+    """
     conn = None
     interactions = []
     try:
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
-        query = "SELECT * FROM hcp_interactions ORDER BY created_at DESC"
-        cursor.execute(query)
+        conditions = []
+        params = []
+        if start_date:
+            conditions.append("interaction_date >= %s")
+            params.append(start_date)
+        if end_date:
+            conditions.append("interaction_date <= %s")
+            params.append(end_date)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"SELECT * FROM hcp_interactions {where} ORDER BY created_at DESC"
+        cursor.execute(query, tuple(params))
         interactions = cursor.fetchall()
     except mysql.connector.Error as err:
         print(f"Error fetching data from DB: {err}")
@@ -173,8 +413,39 @@ def get_all_interactions() -> List[Dict[str, Any]]:
         if conn and conn.is_connected():
             cursor.close()
             conn.close()
+    if start_date or end_date:
+        interactions = _merge_with_archive(interactions, _read_cold_rows(start_date, end_date))
     return interactions
     
+def get_interactions_version() -> Tuple[int, str]:
+    """
+    Returns the change-feed cursor and a version string for the interactions table,
+    read from two single-row tables by primary key. Every insert and update advances
+    the event sequence, and every archival run advances the archive generation, so
+    the version changes whenever the table's contents do.
+    Used as the ETag for the list endpoint.
+    """
+    conn = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT seq.last_id, archive_state.generation
+            FROM hcp_interaction_event_seq seq
+            JOIN hcp_interactions_archive_state archive_state ON archive_state.id = seq.id
+            WHERE seq.id = 1
+        """)
+        row = cursor.fetchone()
+        last_id, generation = row if row else (0, 0)
+        return last_id, f"{last_id}-{generation}"
+    except mysql.connector.Error as err:
+        print(f"Error fetching interactions version from DB: {err}")
+        raise
+    finally:
+        if conn and conn.is_connected():
+            cursor.close()
+            conn.close()
+
 def find_interactions_by_criteria(hcp_name: str, interaction_date: str) -> List[Dict[str, Any]]:
     """Fetches all interaction records matching an HCP name and date."""
     conn = None
@@ -196,6 +467,19 @@ def find_interactions_by_criteria(hcp_name: str, interaction_date: str) -> List[
         if conn and conn.is_connected():
             cursor.close()
             conn.close()
+
+    # Older matches may have been archived; they are listed after the hot ones.
+    day = _parse_date(interaction_date)
+    if day:
+        hot_ids = {row['id'] for row in interactions}
+        archived = [
+            row for row in _read_cold_rows(day, day)
+            if row['hcp_name'] == hcp_name and row['id'] not in hot_ids
+        ]
+        archived.sort(key=lambda row: row['created_at'], reverse=True)
+        interactions += [
+            {key: row[key] for key in ('id', 'hcp_name', 'interaction_date', 'summary')} for row in archived
+        ]
     return interactions
 
 def get_interaction_by_hcp_and_date(hcp_name: str, interaction_date: str) -> Optional[Dict[str, Any]]:
@@ -220,8 +504,210 @@ def get_interaction_by_hcp_and_date(hcp_name: str, interaction_date: str) -> Opt
         if conn and conn.is_connected():
             cursor.close()
             conn.close()
+
+    day = _parse_date(interaction_date)
+    if interaction is None and day:
+        archived = [row for row in _read_cold_rows(day, day) if row['hcp_name'] == hcp_name]
+        if archived:
+            interaction = max(archived, key=lambda row: row['created_at'])
     return interaction
 
+def get_latest_interaction_event_id() -> int:
+    """
+    Returns the newest change-feed cursor, or 0 if no events were ever recorded.
+    Read from the sequence row, so it stays correct after old events are pruned.
+    """
+    conn = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT last_id FROM hcp_interaction_event_seq WHERE id = 1")
+        row = cursor.fetchone()
+        return row[0] if row else 0
+    except mysql.connector.Error as err:
+        print(f"Error fetching latest event ID from DB: {err}")
+        raise
+    finally:
+        if conn and conn.is_connected():
+            cursor.close()
+            conn.close()
+
+def get_oldest_interaction_event_id() -> Optional[int]:
+    """Returns the oldest retained change-feed cursor, or None if the log is empty."""
+    conn = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT MIN(id) FROM hcp_interaction_events")
+        return cursor.fetchone()[0]
+    except mysql.connector.Error as err:
+        print(f"Error fetching oldest event ID from DB: {err}")
+        raise
+    finally:
+        if conn and conn.is_connected():
+            cursor.close()
+            conn.close()
+
+def get_interaction_events_since(last_event_id: int, limit: int = 500) -> List[Dict[str, Any]]:
+    """Fetches change events with an ID greater than `last_event_id`, oldest first."""
+    conn = None
+    events = []
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        query = """
+            SELECT id, interaction_id, event_type, payload FROM hcp_interaction_events
+            WHERE id > %s
+            ORDER BY id
+            LIMIT %s
+        """
+        cursor.execute(query, (last_event_id, limit))
+        events = cursor.fetchall()
+    except mysql.connector.Error as err:
+        print(f"Error fetching events from DB: {err}")
+        raise
+    finally:
+        if conn and conn.is_connected():
+            cursor.close()
+            conn.close()
+    return events
+
+def prune_interaction_events(retention_hours: int) -> int:
+    """Deletes change events older than the retention window and returns how many were removed."""
+    conn = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        query = "DELETE FROM hcp_interaction_events WHERE created_at < NOW() - INTERVAL %s HOUR"
+        cursor.execute(query, (retention_hours,))
+        conn.commit()
+        return cursor.rowcount
+    except mysql.connector.Error as err:
+        print(f"Error pruning events from DB: {err}")
+        raise
+    finally:
+        if conn and conn.is_connected():
+            cursor.close()
+            conn.close()
+
+def rotate_partitions(months_ahead: int = PARTITION_MONTHS_AHEAD) -> int:
+    """
+    Adds monthly partitions so the table always covers `months_ahead` months past the
+    current one, by splitting them off pmax. Returns how many partitions were added.
+    """
+    conn = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        names = _get_partition_names(conn)
+        this_month = date.today().replace(day=1)
+        first_month = _add_months(_partition_month(names[-1]), 1) if names else this_month
+        definitions = _partition_definitions(first_month, _add_months(this_month, months_ahead))
+        if definitions:
+            definitions.append("PARTITION pmax VALUES LESS THAN (MAXVALUE)")
+            cursor.execute(f"ALTER TABLE hcp_interactions REORGANIZE PARTITION pmax INTO ({', '.join(definitions)})")
+        return max(0, len(definitions) - 1)
+    except mysql.connector.Error as err:
+        print(f"Error rotating partitions: {err}")
+        raise
+    finally:
+        if conn and conn.is_connected():
+            cursor.close()
+            conn.close()
+
+def _flush_archive_staging(conn) -> int:
+    """
+    Writes any rows in the staging table to the archive, bumps the archive generation,
+    then drops the table. The generation only changes once the rows can be read from
+    the archive, so an ETag never covers a response that is missing them.
+    The staging table only survives a failed run, so this also recovers from one.
+    """
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("""
+        SELECT COUNT(*) AS table_count FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s
+    """, (DB_NAME, ARCHIVE_STAGING_TABLE))
+    if not cursor.fetchone()['table_count']:
+        cursor.close()
+        return 0
+    cursor.execute(f"SELECT * FROM {ARCHIVE_STAGING_TABLE}")
+    rows = cursor.fetchall()
+    if rows:
+        write_archived_rows(rows)
+    cursor.execute("UPDATE hcp_interactions_archive_state SET generation = generation + 1 WHERE id = 1")
+    conn.commit()
+    cursor.execute(f"DROP TABLE {ARCHIVE_STAGING_TABLE}")
+    cursor.close()
+    return len(rows)
+
+def archive_old_partitions(retention_months: int = HOT_RETENTION_MONTHS) -> int:
+    """
+    Moves every monthly partition that ended more than `retention_months` months ago
+    out of hcp_interactions and into the on-disk archive. Each partition is swapped
+    into a staging table (EXCHANGE PARTITION), written to disk, and only then dropped,
+    so no rows are lost if the export fails. The swap and the drop happen under a
+    table lock, so no write can land in the partition in between.
+    Returns the number of rows archived.
+    """
+    conn = None
+    archived = 0
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        archived += _flush_archive_staging(conn)
+
+        cutoff = _add_months(date.today().replace(day=1), -retention_months)
+        expired = [name for name in _get_partition_names(conn) if _add_months(_partition_month(name), 1) <= cutoff]
+
+        for name in expired:
+            cursor.execute(f"CREATE TABLE {ARCHIVE_STAGING_TABLE} LIKE hcp_interactions")
+            cursor.execute(f"ALTER TABLE {ARCHIVE_STAGING_TABLE} REMOVE PARTITIONING")
+            # The oldest partition accepts any back-dated write, so block writers until
+            # the emptied partition is gone; otherwise a row could land in it and be dropped.
+            cursor.execute(f"LOCK TABLES hcp_interactions WRITE, {ARCHIVE_STAGING_TABLE} WRITE")
+            try:
+                cursor.execute(f"ALTER TABLE hcp_interactions EXCHANGE PARTITION {name} WITH TABLE {ARCHIVE_STAGING_TABLE}")
+                cursor.execute(f"ALTER TABLE hcp_interactions DROP PARTITION {name}")
+            finally:
+                cursor.execute("UNLOCK TABLES")
+            archived += _flush_archive_staging(conn)
+        return archived
+    except mysql.connector.Error as err:
+        print(f"Error archiving partitions: {err}")
+        raise
+    finally:
+        if conn and conn.is_connected():
+            cursor.close()
+            conn.close()
+
+def run_partition_maintenance():
+    """
+    Rotates partitions and archives expired ones. A MySQL named lock ensures only one
+    worker runs this at a time; the others skip the round.
+    """
+    conn = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT GET_LOCK('hcp_partition_maintenance', 0)")
+        if cursor.fetchone()[0] != 1:
+            return
+        try:
+            added = rotate_partitions()
+            archived = archive_old_partitions()
+            if added or archived:
+                print(f"Partition maintenance: added {added} partition(s), archived {archived} row(s).")
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK('hcp_partition_maintenance')")
+            cursor.fetchone()
+    except mysql.connector.Error as err:
+        print(f"Error during partition maintenance: {err}")
+        raise
+    finally:
+        if conn and conn.is_connected():
+            cursor.close()
+            conn.close()
+
 
 if __name__ == '__main__':
     create_tables()
\ No newline at end of file
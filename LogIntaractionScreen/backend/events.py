@@ -0,0 +1,129 @@
+#
+# Live change feed for interaction records.
+# Every write in db.py appends a row to `hcp_interaction_events`. Each worker runs a
+# single poller that tails that table and fans new events out to its own SSE clients,
+# so inserts made by any worker reach every connected client.
+#
+import asyncio
+import os
+import orjson
+from typing import Any, AsyncIterator, Dict, Optional, Set
+from fastapi.concurrency import run_in_threadpool
+from db import (
+    get_interaction_events_since, get_latest_interaction_event_id,
+    get_oldest_interaction_event_id, prune_interaction_events,
+)
+from serializers import interaction_to_api, dumps
+
+# --- Feed Configuration ---
+POLL_INTERVAL_SECONDS = float(os.getenv("EVENT_POLL_INTERVAL", "0.5"))
+HEARTBEAT_SECONDS = float(os.getenv("EVENT_HEARTBEAT_INTERVAL", "15"))
+RETENTION_HOURS = int(os.getenv("EVENT_RETENTION_HOURS", "24"))
+PRUNE_INTERVAL_SECONDS = 3600
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Formats a change event as a Server-Sent Events frame."""
+    payload = event["payload"]
+    if isinstance(payload, (bytes, str)):
+        payload = orjson.loads(payload)
+    data = dumps({"type": event["event_type"], "id": event["interaction_id"], "data": interaction_to_api(payload)})
+    return f"id: {event['id']}\nevent: {event['event_type']}\ndata: {data.decode()}\n\n"
+
+class ChangeFeed:
+    """Tails the event table and broadcasts new events to in-process subscribers."""
+
+    def __init__(self):
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._last_event_id: Optional[int] = None
+
+    async def start(self):
+        """Starts the background poller, beginning at the current end of the log."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stops the background poller."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        last_prune = 0.0
+        while True:
+            try:
+                if self._last_event_id is None:
+                    self._last_event_id = await run_in_threadpool(get_latest_interaction_event_id)
+                events = await run_in_threadpool(get_interaction_events_since, self._last_event_id)
+                for event in events:
+                    self._last_event_id = event["id"]
+                    self._broadcast(event)
+                if loop.time() - last_prune > PRUNE_INTERVAL_SECONDS:
+                    await run_in_threadpool(prune_interaction_events, RETENTION_HOURS)
+                    last_prune = loop.time()
+            except Exception as e:
+                print(f"Change feed poll failed: {e}")
+            await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+    def _broadcast(self, event: Dict[str, Any]):
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # A stalled client is dropped; it reconnects and resumes from its cursor.
+                self._subscribers.discard(queue)
+
+    async def stream(self, cursor: Optional[int]) -> AsyncIterator[str]:
+        """
+        Yields SSE frames for every event after `cursor`: first the backlog from the
+        database, then live events from the poller. Without a cursor the stream starts
+        at the current end of the log.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        # Subscribe before replaying so nothing committed in between is missed.
+        self._subscribers.add(queue)
+        try:
+            latest = await run_in_threadpool(get_latest_interaction_event_id)
+            if cursor is None:
+                cursor = latest
+            else:
+                oldest = await run_in_threadpool(get_oldest_interaction_event_id)
+                # Event IDs are gapless: everything below the oldest retained event was
+                # pruned, or everything up to the latest one if the log is now empty.
+                last_pruned = oldest - 1 if oldest is not None else latest
+                if cursor < last_pruned:
+                    # The cursor predates retained history; the client must reload.
+                    yield "event: reset\ndata: {}\n\n"
+                    return
+
+            while True:
+                backlog = await run_in_threadpool(get_interaction_events_since, cursor)
+                if not backlog:
+                    break
+                for event in backlog:
+                    cursor = event["id"]
+                    yield format_sse(event)
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if queue not in self._subscribers:
+                        return
+                    yield ": keep-alive\n\n"
+                    continue
+                if event["id"] <= cursor:
+                    continue
+                cursor = event["id"]
+                yield format_sse(event)
+        finally:
+            self._subscribers.discard(queue)
+
+# Shared per-worker feed instance, started and stopped with the application.
+change_feed = ChangeFeed()
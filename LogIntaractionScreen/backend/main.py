@@ -9,6 +9,8 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from routers import interaction
 from db import create_tables
+from events import change_feed
+from maintenance import partition_maintenance
 
 # --- FastAPI App Initialization ---
 app = FastAPI(
@@ -26,13 +28,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],      # Allows all HTTP methods (GET, POST, PUT, DELETE, etc.)
     allow_headers=["*"],      # Allows all headers
+    expose_headers=["ETag", "X-Change-Cursor"],  # Lets the frontend read cache and change-feed headers
 )
 
 # --- Application Startup ---
 @app.on_event("startup")
 async def startup_event():
-    """Run on application startup: ensure database tables exist."""
+    """Run on application startup: ensure database tables exist and start background jobs."""
     create_tables()
+    await change_feed.start()
+    await partition_maintenance.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Run on application shutdown: stop background jobs."""
+    await change_feed.stop()
+    await partition_maintenance.stop()
 
 # --- Routers Registration ---
 # Mounts the interaction router under `/api`
@@ -0,0 +1,48 @@
+#
+# Background partition maintenance for hcp_interactions.
+# Periodically adds upcoming monthly partitions and moves expired ones to the
+# on-disk archive. Run `python maintenance.py` to perform one round by hand.
+#
+import asyncio
+import os
+from typing import Optional
+from fastapi.concurrency import run_in_threadpool
+from db import run_partition_maintenance
+
+# --- Maintenance Configuration ---
+MAINTENANCE_INTERVAL_SECONDS = float(os.getenv("PARTITION_MAINTENANCE_INTERVAL", str(24 * 3600)))
+
+class PartitionMaintenance:
+    """Runs partition rotation and archival on a fixed interval."""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Starts the background job; the first round runs immediately."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stops the background job."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await run_in_threadpool(run_partition_maintenance)
+            except Exception as e:
+                print(f"Partition maintenance failed: {e}")
+            await asyncio.sleep(MAINTENANCE_INTERVAL_SECONDS)
+
+# Shared per-worker instance, started and stopped with the application.
+partition_maintenance = PartitionMaintenance()
+
+if __name__ == '__main__':
+    run_partition_maintenance()
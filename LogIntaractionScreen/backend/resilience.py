@@ -0,0 +1,127 @@
+#
+# Overload protection for the LLM-backed endpoints.
+# Provides a per-request deadline (shared by LLM and database calls), a per-worker
+# concurrency budget that sheds excess load with a 503, and a circuit breaker that
+# switches the API into a degraded, rule-based mode while the model keeps failing.
+#
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+from fastapi import HTTPException
+
+# --- Resilience Configuration ---
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "30"))
+MAX_CONCURRENT_LLM_REQUESTS = int(os.getenv("MAX_CONCURRENT_LLM_REQUESTS", "8"))
+RETRY_AFTER_SECONDS = int(os.getenv("RETRY_AFTER_SECONDS", "5"))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", "3"))
+BREAKER_COOLDOWN_SECONDS = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "30"))
+
+class DeadlineExceeded(Exception):
+    """Raised when a request has run out of time before starting more work."""
+
+# Absolute deadline (time.monotonic()) of the request being handled, if any.
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+def start_deadline(seconds: float = REQUEST_DEADLINE_SECONDS) -> float:
+    """Sets the deadline for the current request and returns it."""
+    deadline = time.monotonic() + seconds
+    _deadline.set(deadline)
+    return deadline
+
+def get_deadline() -> Optional[float]:
+    """Returns the deadline of the current request, or None outside a request."""
+    return _deadline.get()
+
+def remaining_time(deadline: Optional[float] = None) -> Optional[float]:
+    """
+    Returns the seconds left before `deadline` (the current request's deadline by default),
+    or None when there is no deadline. Raises DeadlineExceeded once it has passed.
+    """
+    if deadline is None:
+        deadline = _deadline.get()
+    if deadline is None:
+        return None
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise DeadlineExceeded("Request deadline exceeded.")
+    return remaining
+
+class ConcurrencyLimiter:
+    """Non-blocking concurrency budget; callers that do not fit are rejected, not queued."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+
+    def try_acquire(self) -> bool:
+        if self.active >= self.limit:
+            return False
+        self.active += 1
+        return True
+
+    def release(self):
+        self.active = max(0, self.active - 1)
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and stays open for `cooldown_seconds`.
+    After the cooldown it is half-open: exactly one trial request is let through while
+    everyone else still sees it open, and the trial's outcome closes or re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int, cooldown_seconds: float, trial_timeout_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        # A trial that never reports back (e.g. it failed for an unrelated reason) is
+        # given up on after this long, so the breaker cannot stay open forever.
+        self.trial_timeout_seconds = trial_timeout_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+        self.trial_started_at = 0.0
+
+    def is_open(self) -> bool:
+        if self.opened_at is None:
+            return False
+        now = time.monotonic()
+        if self.trial_in_flight and now - self.trial_started_at < self.trial_timeout_seconds:
+            return True
+        if now - self.opened_at >= self.cooldown_seconds:
+            # Half-open: this caller becomes the single trial request.
+            self.trial_in_flight = True
+            self.trial_started_at = now
+            return False
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.trial_in_flight or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self.trial_in_flight = False
+
+# Shared per-worker instances.
+llm_limiter = ConcurrencyLimiter(MAX_CONCURRENT_LLM_REQUESTS)
+llm_breaker = CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_COOLDOWN_SECONDS, REQUEST_DEADLINE_SECONDS)
+
+async def llm_request_slot():
+    """
+    FastAPI dependency for LLM-backed endpoints: rejects the request with a quick 503
+    when the concurrency budget is used up, otherwise starts its deadline.
+    """
+    if not llm_limiter.try_acquire():
+        raise HTTPException(
+            status_code=503,
+            detail="The assistant is busy. Please try again shortly.",
+            headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+        )
+    start_deadline()
+    try:
+        yield
+    finally:
+        llm_limiter.release()
@@ -2,17 +2,38 @@
 # FastAPI Router for handling all API endpoints related to interactions.
 #
 from datetime import date
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Header, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 from models import InteractionBase, ChatMessage, ChatRequest, PopulateRequest
 # MODIFIED: Import the new get_interaction_by_id function
-from db import insert_interaction_to_db, update_interaction_in_db, get_all_interactions, get_interaction_by_id, find_interactions_by_criteria
-from ai_agent import log_runnable, call_llm, tool_runnable, extract_for_form
+from db import insert_interaction_to_db, update_interaction_in_db, get_all_interactions, get_interaction_by_id, find_interactions_by_criteria, get_interactions_version
+from events import change_feed
+from serializers import interaction_to_api, interactions_to_api, dumps, json_response, etag_matches
+from ai_agent import log_runnable, call_llm, tool_runnable, extract_for_form, extract_with_rules, fetch_interaction_tool, LLM_UNAVAILABLE_ERRORS
+from resilience import llm_request_slot, llm_breaker, get_deadline
 from langchain_core.messages import HumanMessage, AIMessage, BaseMessage
 
 # Initialize the API router.
 router = APIRouter()
 
+# Serialized body of the last `/interactions` response and the ETag it was built for.
+# Repeat reads of an unchanged table reuse these bytes instead of re-encoding every row.
+_interactions_cache = {"etag": None, "body": None}
+
+# Shown in place of an AI reply while the model is unavailable (degraded mode).
+DEGRADED_MESSAGE = "The AI assistant is temporarily unavailable. Please use the form to log or edit this interaction."
+
+def _format_fetched_data(fetched_data: dict) -> dict:
+    """Maps the record(s) returned by the fetch tool to their API representation."""
+    records = fetched_data.get('data')
+    if isinstance(records, list):
+        return {**fetched_data, 'data': interactions_to_api(records)}
+    if isinstance(records, dict):
+        return {**fetched_data, 'data': interaction_to_api(records)}
+    return fetched_data
+
 # MODIFIED: This endpoint now returns the newly created record.
 @router.post("/log-interaction/form")
 async def log_form_interaction(interaction: InteractionBase):
@@ -23,17 +44,20 @@ async def log_form_interaction(interaction: InteractionBase):
         interaction_data = interaction.model_dump(by_alias=True)
         new_interaction = insert_interaction_to_db(interaction_data, logging_method="form")
         if new_interaction:
-            return {"status": "success", "message": "Interaction logged successfully.", "data": new_interaction}
+            return json_response({"status": "success", "message": "Interaction logged successfully.", "data": interaction_to_api(new_interaction)})
         else:
             raise HTTPException(status_code=500, detail="Failed to create and retrieve new interaction.")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/log-interaction/chat")
+@router.post("/log-interaction/chat", dependencies=[Depends(llm_request_slot)])
 async def log_chat_interaction(request: ChatRequest):
     """
     Logs an interaction and handles the conversation via the AI agent.
+    While the model is unavailable, pre-fills the form from rule-based extraction instead.
     """
+    if llm_breaker.is_open():
+        return {"status": "degraded", "response": DEGRADED_MESSAGE, "data": extract_with_rules(request.message)}
     try:
         messages: List[BaseMessage] = []
         for msg in request.chatHistory:
@@ -44,7 +68,8 @@ async def log_chat_interaction(request: ChatRequest):
         
         messages.append(HumanMessage(content=request.message))
         
-        agent_output = log_runnable.invoke({"messages": messages})
+        deadline = get_deadline()
+        agent_output = await run_in_threadpool(log_runnable.invoke, {"messages": messages, "deadline": deadline})
         
         log_data = agent_output.get('parsed_data')
         
@@ -54,16 +79,21 @@ async def log_chat_interaction(request: ChatRequest):
             else:
                 log_data['interactionDate'] = log_data.pop('date')
 
-            insert_interaction_to_db(log_data, logging_method="chat")
+            await run_in_threadpool(insert_interaction_to_db, log_data, logging_method="chat")
+            llm_breaker.record_success()
             
             return {"status": "success", "response": "Great! I've got it all saved."}
         
         else:
-            llm_response = call_llm({"messages": messages})
+            llm_response = await run_in_threadpool(call_llm, {"messages": messages, "deadline": deadline})
             response_message_content = llm_response.get('messages')[-1].content
+            llm_breaker.record_success()
             
             return {"status": "continue", "response": response_message_content}
             
+    except LLM_UNAVAILABLE_ERRORS:
+        llm_breaker.record_failure()
+        return {"status": "degraded", "response": DEGRADED_MESSAGE, "data": extract_with_rules(request.message)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An internal error occurred: {e}")
 
@@ -82,45 +112,95 @@ async def edit_interaction(interaction_id: int, updated_interaction: Interaction
         raise HTTPException(status_code=500, detail=str(e))
         
 @router.get("/interactions")
-async def get_interactions():
+async def get_interactions(start_date: Optional[date] = None, end_date: Optional[date] = None,
+                           if_none_match: Optional[str] = Header(None)):
     """
-    Retrieves all interaction records.
+    Retrieves all interaction records in the hot table, or those in an interaction date
+    range (including archived months) when `start_date`/`end_date` are given.
+    Returns 304 when `If-None-Match` matches the current ETag, without reading any rows.
+    The `X-Change-Cursor` header is the change-feed position this snapshot is current as of.
     """
     try:
-        interactions = get_all_interactions()
-        return interactions
+        # Read the cursor and version before the rows: replaying an event already in the snapshot is harmless.
+        cursor, version = get_interactions_version()
+        ranged = start_date is not None or end_date is not None
+        # Archiving changes the hot table's version too, so it also covers archived rows in a range.
+        etag = f'"{version}:{start_date or ""}:{end_date or ""}"' if ranged else f'"{version}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "X-Change-Cursor": str(cursor)}
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        if ranged:
+            return json_response(interactions_to_api(get_all_interactions(start_date, end_date)), headers=headers)
+        if _interactions_cache["etag"] != etag:
+            body = dumps(interactions_to_api(get_all_interactions()))
+            _interactions_cache.update(etag=etag, body=body)
+        return json_response(body=_interactions_cache["body"], headers=headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An internal error occurred: {e}")
+
+@router.get("/interactions/stream")
+async def stream_interactions(cursor: Optional[int] = None, last_event_id: Optional[int] = Header(None)):
+    """
+    Streams insert and update events as Server-Sent Events.
+    Resumes after `Last-Event-ID` on reconnect, or after `cursor` on the first connection.
+    Without either, only events from now on are sent.
+    """
+    start = last_event_id if last_event_id is not None else cursor
+    return StreamingResponse(
+        change_feed.stream(start),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
         
-@router.post("/populate-form-from-chat")
+async def _populate_with_rules(message: str):
+    """Degraded-mode lookup: finds the HCP name and date with patterns and calls the fetch tool directly."""
+    criteria = extract_with_rules(message)
+    if not criteria:
+        return json_response({"status": "degraded", "response": DEGRADED_MESSAGE, "data": None})
+    fetched_data = await run_in_threadpool(
+        fetch_interaction_tool.invoke,
+        {"hcp_name": criteria['hcpName'], "interaction_date": criteria['interactionDate']},
+    )
+    return json_response({"status": "success", "data": _format_fetched_data(fetched_data)})
+
+@router.post("/populate-form-from-chat", dependencies=[Depends(llm_request_slot)])
 async def populate_form_from_chat(request: ChatRequest):
     """
     Takes a chat message and uses the AI agent's tool to fetch a record from the DB.
     """
+    if llm_breaker.is_open():
+        return await _populate_with_rules(request.message)
     try:
         messages = [HumanMessage(content=request.message)]
-        agent_input = {"messages": messages, "interaction_id": request.interactionId}
-        agent_output = tool_runnable.invoke(agent_input)
+        agent_input = {"messages": messages, "interaction_id": request.interactionId, "deadline": get_deadline()}
+        agent_output = await run_in_threadpool(tool_runnable.invoke, agent_input)
+        llm_breaker.record_success()
         
         fetched_data = agent_output.get('fetched_data')
         
         if fetched_data:
-            return {"status": "success", "data": fetched_data}
+            return json_response({"status": "success", "data": _format_fetched_data(fetched_data)})
         else:
             raise HTTPException(status_code=404, detail="Could not find a matching interaction.")
             
+    except LLM_UNAVAILABLE_ERRORS:
+        llm_breaker.record_failure()
+        return await _populate_with_rules(request.message)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An internal error occurred: {e}")
 
-@router.post("/update-from-chat")
+@router.post("/update-from-chat", dependencies=[Depends(llm_request_slot)])
 async def update_from_chat(request: ChatRequest):
     """
     Handles a chat-based request to update an existing database record.
     """
+    if llm_breaker.is_open():
+        return {"status": "degraded", "response": DEGRADED_MESSAGE}
     try:
         messages = [HumanMessage(content=request.message)]
-        agent_input = {"messages": messages, "interaction_id": request.interactionId}
-        agent_output = tool_runnable.invoke(agent_input)
+        agent_input = {"messages": messages, "interaction_id": request.interactionId, "deadline": get_deadline()}
+        agent_output = await run_in_threadpool(tool_runnable.invoke, agent_input)
+        llm_breaker.record_success()
         
         tool_output = agent_output.get('tool_output')
         
@@ -130,19 +210,35 @@ async def update_from_chat(request: ChatRequest):
             llm_response = agent_output.get('messages', [])[-1]
             return {"status": "continue", "response": llm_response.content}
             
+    except LLM_UNAVAILABLE_ERRORS:
+        llm_breaker.record_failure()
+        return {"status": "degraded", "response": DEGRADED_MESSAGE}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An internal error occurred: {e}")
 
-@router.post("/extract-and-populate")
+def _extract_with_rules_response(message: str):
+    """Degraded-mode extraction: pre-fills the form from rule-based extraction."""
+    extracted_data = extract_with_rules(message)
+    if extracted_data:
+        return json_response({"status": "success", "data": extracted_data, "degraded": True})
+    return json_response({"status": "failure", "data": None, "degraded": True})
+
+@router.post("/extract-and-populate", dependencies=[Depends(llm_request_slot)])
 async def extract_and_populate_form(request: PopulateRequest):
     """
     Takes an unstructured prompt, extracts interaction details, and returns them as JSON.
     """
+    if llm_breaker.is_open():
+        return _extract_with_rules_response(request.message)
     try:
-        extracted_data = extract_for_form(request.message)
+        extracted_data = await run_in_threadpool(extract_for_form, request.message, get_deadline())
+        llm_breaker.record_success()
         if extracted_data and extracted_data.get('hcpName'):
-            return {"status": "success", "data": extracted_data}
+            return json_response({"status": "success", "data": extracted_data})
         else:
-            return {"status": "failure", "data": None}
+            return json_response({"status": "failure", "data": None})
+    except LLM_UNAVAILABLE_ERRORS:
+        llm_breaker.record_failure()
+        return _extract_with_rules_response(request.message)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An internal error occurred: {e}")
\ No newline at end of file
@@ -0,0 +1,60 @@
+#
+# Response serialization for interaction records.
+# Rows from mysql.connector are mapped to the camelCase API shape explicitly and
+# encoded with orjson, bypassing FastAPI's much slower default JSON encoder.
+#
+import orjson
+from fastapi import Response
+from typing import Any, Dict, List, Optional
+
+# Database column -> API field. Columns not listed here are never sent to clients.
+INTERACTION_COLUMN_MAP = {
+    'id': 'id',
+    'hcp_name': 'hcpName',
+    'interaction_type': 'interactionType',
+    'interaction_date': 'interactionDate',
+    'summary': 'summary',
+    'discussion_topics': 'discussionTopics',
+    'sentiment': 'sentiment',
+    'outcomes': 'outcomes',
+    'follow_up': 'followUp',
+    'logging_method': 'loggingMethod',
+    'created_at': 'createdAt',
+    'updated_at': 'updatedAt',
+    'row_version': 'rowVersion',
+}
+
+def interaction_to_api(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Maps a (possibly partial) interaction row to its camelCase API representation."""
+    result = {}
+    for column, value in row.items():
+        field = INTERACTION_COLUMN_MAP.get(column)
+        if field is None:
+            continue
+        # JSON columns come back from mysql.connector as strings.
+        if column == 'discussion_topics' and isinstance(value, (str, bytes)):
+            value = orjson.loads(value)
+        result[field] = value
+    return result
+
+def interactions_to_api(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Maps a list of interaction rows to their API representation."""
+    return [interaction_to_api(row) for row in rows]
+
+def dumps(content: Any) -> bytes:
+    """Encodes content to JSON bytes; dates and datetimes are written as ISO 8601."""
+    return orjson.dumps(content)
+
+def json_response(content: Any = None, body: Optional[bytes] = None, status_code: int = 200,
+                  headers: Optional[Dict[str, str]] = None) -> Response:
+    """Builds a JSON response from content, or from an already-serialized body."""
+    if body is None:
+        body = dumps(content)
+    return Response(content=body, status_code=status_code, headers=headers, media_type="application/json")
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Checks an If-None-Match header value against an ETag."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in candidates or etag in candidates or f'W/{etag}' in candidates
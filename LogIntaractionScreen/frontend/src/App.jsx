@@ -1,17 +1,8 @@
-import { useState } from "react";
 import FormView from "./component/FormView";
 import ChatView from "./component/ChatView";
 import InteractionList from "./component/InteractionList";
 
 const App = () => {
-  // State to trigger a refresh in the list component
-  const [refreshKey, setRefreshKey] = useState(0);
-
-  // A function to be called on successful submission to trigger the refresh
-  const handleFormSuccess = () => {
-    setRefreshKey(prevKey => prevKey + 1); 
-  };
-
   return (
     <div className="max-w-6xl mx-auto p-12 bg-gray-100 font-serif text-gray-800">
       <header className="text-center mb-10">
@@ -22,10 +13,9 @@ const App = () => {
         {/* Left Panel: Form and List */}
         <div className="w-1/2 p-8 bg-white rounded-lg shadow-md border border-gray-200">
           <h2 className="text-2xl font-semibold mb-6 text-gray-700 border-b pb-2">Interaction Details</h2>
-          {/* Pass the success handler to the form */}
-          <FormView onSuccess={handleFormSuccess} />
-          {/* Pass the refresh key to the list */}
-          <InteractionList refreshKey={refreshKey} />
+          <FormView />
+          {/* The list keeps itself current from the live change feed */}
+          <InteractionList />
         </div>
 
         {/* Right Panel: Chat */}
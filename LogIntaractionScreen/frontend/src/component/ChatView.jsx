@@ -20,7 +20,7 @@ const ChatView = () => {
 
     const handleSelectChoice = (interaction) => {
         dispatch(startEdit({ id: interaction.id, data: interaction }));
-        dispatch(addMessage({ sender: 'agent', text: `Great, I've loaded the interaction with ${interaction.hcp_name} from ${new Date(interaction.interaction_date).toLocaleDateString()}. How can I help you update it?` }));
+        dispatch(addMessage({ sender: 'agent', text: `Great, I've loaded the interaction with ${interaction.hcpName} from ${new Date(interaction.interactionDate).toLocaleDateString()}. How can I help you update it?` }));
         setChoices([]);
     };
     
@@ -70,7 +70,8 @@ const ChatView = () => {
                         dispatch(addMessage({ sender: 'agent', text: "Sorry, I couldn't find any matching interactions." }));
                     }
                 } else {
-                    dispatch(addMessage({ sender: "agent", text: result.response }));
+                    // `detail` carries the reason when the server sheds load (503).
+                    dispatch(addMessage({ sender: "agent", text: result.response || result.detail }));
                 }
             } catch (error) {
                 dispatch(addMessage({ sender: "agent", text: "Sorry, something went wrong with that command." }));
@@ -115,7 +116,13 @@ const ChatView = () => {
                 body: JSON.stringify({ message: currentInput, chatHistory: chatHistory, interactionId: editingId }),
             });
             const result = await response.json();
-            dispatch(addMessage({ sender: "agent", text: result.response }));
+            dispatch(addMessage({ sender: "agent", text: result.response || result.detail }));
+            // In degraded mode the server falls back to rule-based extraction; let the user finish in the form.
+            if (result.status === 'degraded' && result.data) {
+                dispatch(resetForm());
+                dispatch(updateForm(result.data));
+                setNeedsConfirmation(true);
+            }
         } catch (error) {
              dispatch(addMessage({ sender: "agent", text: "Sorry, I'm having trouble connecting." }));
         } finally {
@@ -137,7 +144,7 @@ const ChatView = () => {
                     <div className="space-y-2 my-2">
                         {choices.map(choice => (
                             <button key={choice.id} onClick={() => handleSelectChoice(choice)} className="w-full text-left p-2 border rounded-md bg-white hover:bg-indigo-50">
-                                <p className="font-semibold">{choice.hcp_name} - {new Date(choice.interaction_date).toLocaleDateString()}</p>
+                                <p className="font-semibold">{choice.hcpName} - {new Date(choice.interactionDate).toLocaleDateString()}</p>
                                 <p className="text-sm text-gray-600 truncate">{choice.summary}</p>
                             </button>
                         ))}
@@ -2,32 +2,71 @@ import React, { useState, useEffect } from "react";
 import { useDispatch } from "react-redux";
 import { startEdit } from "../store/formSlice";
 
-const InteractionList = ({ refreshKey }) => {
+const API_BASE = "http://localhost:8000/api";
+
+// Applies a single change-feed event to the current list (newest first).
+const applyChange = (interactions, change) => {
+  const index = interactions.findIndex((item) => item.id === change.id);
+  if (index === -1) {
+    return change.type === "insert" ? [change.data, ...interactions] : interactions;
+  }
+  const next = [...interactions];
+  next[index] = { ...next[index], ...change.data };
+  return next;
+};
+
+const InteractionList = () => {
   const dispatch = useDispatch();
   const [interactions, setInteractions] = useState([]);
   const [loading, setLoading] = useState(true);
+  // Bumped when the server asks for a full reload (cursor older than retained history).
+  const [snapshotKey, setSnapshotKey] = useState(0);
+
+  // Load the list once, then keep it current by applying deltas from the change feed.
+  useEffect(() => {
+    let source = null;
+    let cancelled = false;
+
+    const handleChange = (event) => {
+      const change = JSON.parse(event.data);
+      setInteractions((current) => applyChange(current, change));
+    };
 
-  const fetchInteractions = async () => {
-    setLoading(true);
-    try {
-      const response = await fetch("http://localhost:8000/api/interactions");
-      if (response.ok) {
+    const loadAndSubscribe = async () => {
+      setLoading(true);
+      try {
+        const response = await fetch(`${API_BASE}/interactions`);
+        if (!response.ok) {
+          console.error("Failed to fetch interactions.");
+          return;
+        }
         const data = await response.json();
+        if (cancelled) return;
         setInteractions(data);
-      } else {
-        console.error("Failed to fetch interactions.");
+
+        // EventSource resends Last-Event-ID on reconnect, so the cursor is only needed once.
+        const cursor = response.headers.get("X-Change-Cursor");
+        const query = cursor !== null ? `?cursor=${cursor}` : "";
+        source = new EventSource(`${API_BASE}/interactions/stream${query}`);
+        source.addEventListener("insert", handleChange);
+        source.addEventListener("update", handleChange);
+        source.addEventListener("reset", () => {
+          source.close();
+          setSnapshotKey((key) => key + 1);
+        });
+      } catch (error) {
+        console.error("Network error:", error);
+      } finally {
+        if (!cancelled) setLoading(false);
       }
-    } catch (error) {
-      console.error("Network error:", error);
-    } finally {
-      setLoading(false);
-    }
-  };
+    };
 
-  // This useEffect now depends on refreshKey
-  useEffect(() => {
-    fetchInteractions();
-  }, [refreshKey]);
+    loadAndSubscribe();
+    return () => {
+      cancelled = true;
+      if (source) source.close();
+    };
+  }, [snapshotKey]);
 
   const handleEdit = (interaction) => {
     dispatch(startEdit({ id: interaction.id, data: interaction }));
@@ -46,9 +85,9 @@ const InteractionList = ({ refreshKey }) => {
         interactions.map((interaction) => (
           <div key={interaction.id} className="p-4 border rounded-md shadow-sm bg-gray-50 flex justify-between items-center">
             <div>
-              <p className="text-md font-medium text-gray-700">{interaction.hcp_name}</p>
+              <p className="text-md font-medium text-gray-700">{interaction.hcpName}</p>
               <p className="text-sm text-gray-500">
-                {new Date(interaction.interaction_date).toLocaleDateString()}
+                {new Date(interaction.interactionDate).toLocaleDateString()}
               </p>
             </div>
             <button
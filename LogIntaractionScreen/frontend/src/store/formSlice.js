@@ -44,20 +44,16 @@ const formSlice = createSlice({
     },
     startEdit: (state, action) => {
       const { id, data } = action.payload;
-      let parsedTopics = [];
-      if (data.discussion_topics && typeof data.discussion_topics === 'string') {
-        try { parsedTopics = JSON.parse(data.discussion_topics); } catch (e) { console.error("Error parsing JSON:", e); }
-      }
 
-      state.hcpName = data.hcp_name || "";
-      state.interactionType = data.interaction_type || "Meeting";
-      state.interactionDate = data.interaction_date ? data.interaction_date.split('T')[0] : "";
+      state.hcpName = data.hcpName || "";
+      state.interactionType = data.interactionType || "Meeting";
+      state.interactionDate = data.interactionDate ? data.interactionDate.split('T')[0] : "";
       state.summary = data.summary || "";
-      state.discussionTopics = Array.isArray(parsedTopics) ? parsedTopics.join(", ") : "";
+      state.discussionTopics = Array.isArray(data.discussionTopics) ? data.discussionTopics.join(", ") : "";
       state.sentiment = capitalize(data.sentiment) || "Positive";
       state.outcomes = data.outcomes || "";
-      state.followUp = data.follow_up || "";
-      state.createdAt = data.created_at || "";
+      state.followUp = data.followUp || "";
+      state.createdAt = data.createdAt || "";
       state.editingId = id;
     },
     // NEW: Add this reducer to set only the active ID for chat context.